@@ -1,5 +1,6 @@
 """FastAPI dependencies for authentication and authorization."""
 
+from collections import OrderedDict
 from typing import Annotated
 from uuid import UUID
 
@@ -13,6 +14,38 @@ from backend.models.user import User
 
 security = HTTPBearer()
 
+# Tokens that already failed JWT verification. A token that fails once (bad
+# signature, malformed, expired) can never become valid, so clients retrying with
+# it skip the decode. Valid tokens are never cached, so expiry is always checked.
+_INVALID_TOKEN_CACHE_SIZE = 256
+_invalid_tokens: OrderedDict[str, None] = OrderedDict()
+
+
+def _is_known_invalid_token(token: str) -> bool:
+    """Check whether a token has already failed verification.
+
+    Args:
+        token: Raw bearer token
+
+    Returns:
+        True if the token is in the invalid-token cache
+    """
+    if token not in _invalid_tokens:
+        return False
+    _invalid_tokens.move_to_end(token)
+    return True
+
+
+def _remember_invalid_token(token: str) -> None:
+    """Add a token that failed verification to the bounded invalid-token cache.
+
+    Args:
+        token: Raw bearer token
+    """
+    _invalid_tokens[token] = None
+    if len(_invalid_tokens) > _INVALID_TOKEN_CACHE_SIZE:
+        _invalid_tokens.popitem(last=False)
+
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
@@ -31,9 +64,10 @@ async def get_current_user(
         HTTPException: If token is invalid or user not found
     """
     token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = None if _is_known_invalid_token(token) else decode_access_token(token)
 
     if payload is None:
+        _remember_invalid_token(token)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
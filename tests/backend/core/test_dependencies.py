@@ -0,0 +1,56 @@
+"""Tests for authentication dependencies."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from backend.core import dependencies
+from backend.core.dependencies import get_current_user
+
+
+def _credentials(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_decodes_invalid_token_only_once():
+    """Test that a token which failed verification is rejected without decoding it again."""
+    with patch("backend.core.dependencies.decode_access_token", return_value=None) as mock_decode:
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user(_credentials("invalid_token"), MagicMock())
+
+            assert exc_info.value.status_code == 401
+            assert exc_info.value.detail == "Invalid authentication credentials"
+
+    mock_decode.assert_called_once_with("invalid_token")
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_does_not_cache_valid_tokens():
+    """Test that valid tokens are decoded on every request so expiry is always checked."""
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = MagicMock()
+
+    with patch(
+        "backend.core.dependencies.decode_access_token",
+        return_value={"sub": "00000000-0000-0000-0000-000000000001"},
+    ) as mock_decode:
+        await get_current_user(_credentials("valid_token"), db)
+        await get_current_user(_credentials("valid_token"), db)
+
+    assert mock_decode.call_count == 2
+    assert "valid_token" not in dependencies._invalid_tokens
+
+
+def test_invalid_token_cache_is_bounded():
+    """Test that the invalid-token cache evicts the least recently seen token when full."""
+    with patch.object(dependencies, "_INVALID_TOKEN_CACHE_SIZE", 2):
+        dependencies._remember_invalid_token("first")
+        dependencies._remember_invalid_token("second")
+        assert dependencies._is_known_invalid_token("first")  # Now most recently seen
+        dependencies._remember_invalid_token("third")
+
+    assert list(dependencies._invalid_tokens) == ["first", "third"]
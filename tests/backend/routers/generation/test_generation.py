@@ -1,491 +1,379 @@
 """Tests for generation router."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
-from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
 
 from backend.core.generation import GenerationError
 from backend.models.asset import Asset
 from backend.models.generation_record import GenerationRecord
 from backend.models.project import Project
+from backend.models.user import User
 from fastapi.testclient import TestClient
 
-
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_success(mock_background: MagicMock, test_client: TestClient, create_user, test_db_session):
-    """Test successful content generation returns 202 Accepted."""
-
-    # Create user and project
-    user, token = create_user(
-        email="genuser@example.com",
-        password="testpassword123",
-        name="Gen User",
-    )
-
-    project = Project(
-        owner_id=user.id,
-        name="Test Project",
-        description="Test project for generation",
-    )
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    # Create request
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Launch a new product campaign",
-        "brand_tone": "Professional and friendly",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    # Should return 202 Accepted
-    assert response.status_code == 202
-    data = response.json()
-    assert "generation_id" in data
-    assert "status" in data
-    assert "message" in data
-    assert data["generation_id"] is not None
-    assert data["status"] == "pending"
-    assert data["message"] == "Generation started"
-
-    # Verify generation record was created with pending status
-    record = test_db_session.query(GenerationRecord).filter(GenerationRecord.project_id == project.id).first()
-    assert record is not None
-    assert str(record.id) == data["generation_id"]
-    assert record.user_id == user.id
-    assert record.status == "pending"
-    assert "Launch a new product campaign" in record.prompt
-
-    # Verify background task was added
-    assert mock_background.called
-
-
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_with_all_optional_fields(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test content generation with all optional fields returns 202 Accepted."""
-
-    user, token = create_user(
-        email="allfields@example.com",
-        password="testpassword123",
-        name="All Fields User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Campaign brief",
-        "brand_tone": "Casual",
-        "audience": "Young professionals",
-        "objective": "Increase brand awareness",
-        "channels": ["social", "email"],
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 202
-    data = response.json()
-    assert data["status"] == "pending"
-    assert "generation_id" in data
-
-    # Verify background task was called
-    assert mock_background.called
-
-
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_with_assets(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test content generation with project assets returns 202 Accepted."""
-
-    user, token = create_user(
-        email="assets@example.com",
-        password="testpassword123",
-        name="Assets User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    # Create assets
-    asset1 = Asset(
-        project_id=project.id,
-        filename="document.pdf",
-        content_type="application/pdf",
-        ingested=True,
-    )
-    asset2 = Asset(
-        project_id=project.id,
-        filename="image.jpg",
-        content_type="image/jpeg",
-        ingested=False,
-    )
-    test_db_session.add_all([asset1, asset2])
-    test_db_session.commit()
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 202
-
-    # Verify background task was called with asset summaries
-    assert mock_background.called
-    call_args = mock_background.call_args
-    # Arguments: generation_id, brief, project_id, project_name, 
-    # project_description, brand_tone, objective, asset_summaries
-    asset_summaries = call_args[0][7]  # asset_summaries is the 8th positional argument (after adding objective)
-    assert asset_summaries is not None
-    assert len(asset_summaries) == 2
-    assert asset_summaries[0]["filename"] == "document.pdf"
-    assert asset_summaries[1]["filename"] == "image.jpg"
-
-
-def test_generate_content_without_auth(test_client: TestClient):
-    """Test content generation without authentication returns 403."""
-    request_data = {
-        "project_id": str(uuid4()),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post("/api/generate", json=request_data)
-
-    assert response.status_code == 403
-
-
-def test_generate_content_with_nonexistent_project(test_client: TestClient, create_user):
-    """Test content generation with non-existent project returns 404."""
-    user, token = create_user(
-        email="notfound@example.com",
-        password="testpassword123",
-        name="Not Found User",
-    )
-
-    request_data = {
-        "project_id": str(uuid4()),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 404
-    assert response.json()["detail"] == "Project not found"
-
-
-def test_generate_content_with_other_user_project(test_client: TestClient, create_user, test_db_session):
-    """Test content generation with another user's project returns 403."""
-    user1, _ = create_user(
-        email="owner@example.com",
-        password="testpassword123",
-        name="Owner",
-    )
-    user2, token2 = create_user(
-        email="other@example.com",
-        password="testpassword123",
-        name="Other User",
-    )
-
-    project = Project(owner_id=user1.id, name="Owner's Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token2}"},
-    )
-
-    assert response.status_code == 403
-    assert response.json()["detail"] == "Not authorized to generate content for this project"
-
-
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_accepts_request_even_if_background_fails(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test that POST endpoint accepts request even if background task will fail."""
-
-    # Background task errors are handled internally, endpoint should still return 202
-    user, token = create_user(
-        email="error@example.com",
-        password="testpassword123",
-        name="Error User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    # Should still return 202 Accepted - errors are handled in background task
-    assert response.status_code == 202
-
-    # Verify generation record was created with pending status
-    record = test_db_session.query(GenerationRecord).filter(GenerationRecord.project_id == project.id).first()
-    assert record is not None
-    assert record.status == "pending"
-
-
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_handles_unexpected_errors_in_background(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test that unexpected errors in background task don't affect endpoint response."""
-
-    user, token = create_user(
-        email="unexpected@example.com",
-        password="testpassword123",
-        name="Unexpected User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    # Should still return 202 Accepted - errors are handled in background task
-    assert response.status_code == 202
-
-
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_creates_generation_record(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test that generation record is created with pending status."""
-
-    user, token = create_user(
-        email="record@example.com",
-        password="testpassword123",
-        name="Record User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Test brief",
-        "brand_tone": "Professional",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 202
-
-    # Verify generation record is created with pending status
-    record = test_db_session.query(GenerationRecord).filter(GenerationRecord.project_id == project.id).first()
-    assert record is not None
-    assert record.user_id == user.id
-    assert record.project_id == project.id
-    assert record.status == "pending"
-    assert record.response is None  # Response not yet populated
-    assert "Test brief" in record.prompt
-    assert "Professional" in record.prompt
-
-
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_with_minimal_request(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test content generation with minimal required fields only returns 202 Accepted."""
-
-    user, token = create_user(
-        email="minimal@example.com",
-        password="testpassword123",
-        name="Minimal User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 202
-    data = response.json()
-    assert "generation_id" in data
-    assert "status" in data
-    assert "message" in data
-    assert data["status"] == "pending"
-
-
-def test_generate_content_with_invalid_project_id_format(test_client: TestClient, create_user):
-    """Test content generation with invalid project ID format."""
-    user, token = create_user(
-        email="invalid@example.com",
-        password="testpassword123",
-        name="Invalid User",
-    )
-
-    request_data = {
-        "project_id": "not-a-uuid",
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
+pytestmark = pytest.mark.unit
+
+
+class _FakeGenerateContentVariants:
+    """Async stand-in for generate_content_variants that records the keyword arguments of each call."""
+
+    def __init__(self):
+        self.calls: list[dict] = []
+
+    async def __call__(self, **kwargs) -> dict:
+        self.calls.append(kwargs)
+        return {
+            "short_form": "Content",
+            "long_form": "Content",
+            "cta": "Content",
+            "metadata": {"model": "gpt-3.5-turbo-instruct", "provider": "openai"},
+        }
+
+
+@pytest.fixture(autouse=True)
+def fake_generate(monkeypatch: pytest.MonkeyPatch) -> _FakeGenerateContentVariants:
+    """Replace generate_content_variants so background generation never calls a model."""
+    fake = _FakeGenerateContentVariants()
+    monkeypatch.setattr("backend.routers.generation.generate_content_variants", fake)
+    return fake
+
+
+@pytest.fixture
+def mock_background(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Replace the background generation task so requests return without running it."""
+    mock = MagicMock()
+    monkeypatch.setattr("backend.routers.generation._generate_content_background", mock)
+    return mock
+
+
+# Built once and reused so each lookup only binds a new project_id
+_LATEST_RECORD_FOR_PROJECT = (
+    select(GenerationRecord)
+    .where(GenerationRecord.project_id == bindparam("project_id"))
+    .order_by(GenerationRecord.created_at.desc())
+    .limit(1)
+)
+
+DEFAULT_GENERATION_RESPONSE = {
+    "short_form": "Content",
+    "long_form": "Content",
+    "cta": "Content",
+}
+
+
+def _seed_generation(
+    session: Session,
+    project_id: UUID,
+    user_id: UUID,
+    created_at: datetime,
+    response: dict | None = None,
+) -> GenerationRecord:
+    """Insert a completed generation record directly, bypassing POST /api/generate.
+
+    The record is only flushed; the test's outer transaction discards it on teardown.
+
+    Args:
+        session: Database session
+        project_id: ID of the project the record belongs to
+        user_id: ID of the user who requested the generation
+        created_at: Creation timestamp, used to order records
+        response: Stored content variants (defaults to DEFAULT_GENERATION_RESPONSE)
+
+    Returns:
+        The created GenerationRecord
+    """
+    generation_record = GenerationRecord(
+        project_id=project_id,
+        user_id=user_id,
+        prompt="Brief: Test brief",
+        response=dict(response or DEFAULT_GENERATION_RESPONSE),
+        model="gpt-3.5-turbo-instruct",
+        tokens=None,
+        status="completed",
+        created_at=created_at,
     )
+    session.add(generation_record)
+    session.flush()
+    return generation_record
 
-    # FastAPI will validate UUID format and return 422
-    assert response.status_code == 422
 
+@pytest.fixture
+def authenticated_user(create_user) -> tuple[User, dict[str, str]]:
+    """Create a user and the bearer headers that authenticate as them.
 
-def test_generate_content_with_empty_brief(test_client: TestClient, create_user, test_db_session):
-    """Test content generation with empty brief returns validation error."""
+    Returns:
+        Tuple of (user, auth headers)
+    """
     user, token = create_user(
-        email="empty@example.com",
         password="testpassword123",
-        name="Empty User",
+        name="Gen User",
     )
+    return user, {"Authorization": f"Bearer {token}"}
 
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
 
-    # Pydantic validation should reject empty brief
-    assert response.status_code == 422
+@pytest.fixture
+def user_with_project(
+    authenticated_user: tuple[User, dict[str, str]], test_db_session
+) -> tuple[User, dict[str, str], Project]:
+    """Create a user that owns one project.
 
+    Returns:
+        Tuple of (user, auth headers, project)
+    """
+    user, auth_headers = authenticated_user
 
-@patch("backend.routers.generation._generate_content_background")
-def test_generate_content_returns_202_with_pending_status(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test that POST /api/generate returns 202 Accepted with pending status."""
-
-    user, token = create_user(
-        email="variants@example.com",
-        password="testpassword123",
-        name="Variants User",
+    project = Project(
+        owner_id=user.id,
+        name="Test Project",
+        description="Test project for generation",
     )
-
-    project = Project(owner_id=user.id, name="Test Project")
     test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    request_data = {
-        "project_id": str(project.id),
-        "brief": "Campaign brief",
-    }
-
-    response = test_client.post(
-        "/api/generate",
-        json=request_data,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 202
-    data = response.json()
-    assert "generation_id" in data
-    assert "status" in data
-    assert "message" in data
-    assert data["status"] == "pending"
-    assert data["message"] == "Generation started"
+    test_db_session.flush()  # Populates the client-side UUID without a commit + refresh round-trip
+
+    return user, auth_headers, project
+
+
+@pytest.fixture
+def two_generations(
+    user_with_project: tuple[User, dict[str, str], Project], test_db_session
+) -> tuple[dict[str, str], Project, UUID, UUID]:
+    """Seed two completed generations for the user_with_project project.
+
+    Returns:
+        Tuple of (auth headers, project, older generation ID, latest generation ID)
+    """
+    user, auth_headers, project = user_with_project
+
+    now = datetime.now(timezone.utc)
+    older = _seed_generation(test_db_session, project.id, user.id, created_at=now)
+    latest = _seed_generation(test_db_session, project.id, user.id, created_at=now + timedelta(seconds=1))
+
+    return auth_headers, project, older.id, latest.id
+
+
+class TestGenerateSuccess:
+    """Tests for POST /api/generate requests that are accepted for background generation."""
+
+    @pytest.mark.parametrize(
+        ("optional_fields", "expected_prompt_lines"),
+        [
+            pytest.param({}, [], id="minimal_request"),
+            pytest.param(
+                {"brand_tone": "Professional and friendly"},
+                ["Brand Tone: Professional and friendly"],
+                id="with_brand_tone",
+            ),
+            pytest.param(
+                {
+                    "brand_tone": "Casual",
+                    "audience": "Young professionals",
+                    "objective": "Increase brand awareness",
+                    "channels": ["social", "email"],
+                },
+                [
+                    "Brand Tone: Casual",
+                    "Target Audience: Young professionals",
+                    "Objective: Increase brand awareness",
+                    "Channels: social, email",
+                ],
+                id="all_optional_fields",
+            ),
+        ],
+    )
+    def test_generate_content_returns_202_and_creates_pending_record(
+        self,
+        optional_fields: dict,
+        expected_prompt_lines: list[str],
+        mock_background: MagicMock,
+        test_client: TestClient,
+        user_with_project,
+        test_db_session,
+    ):
+        """Test that POST /api/generate returns 202 Accepted and leaves a pending record for the background task."""
+        user, auth_headers, project = user_with_project
+
+        request_data = {
+            "project_id": str(project.id),
+            "brief": "Launch a new product campaign",
+            **optional_fields,
+        }
+
+        response = test_client.post(
+            "/api/generate",
+            json=request_data,
+            headers=auth_headers,
+        )
+
+        # Errors in the background task never reach the endpoint, so the response is always 202
+        assert response.status_code == 202
+        data = response.json()
+        assert data["generation_id"] is not None
+        assert data["status"] == "pending"
+        assert data["message"] == "Generation started"
+
+        record = test_db_session.execute(_LATEST_RECORD_FOR_PROJECT, {"project_id": project.id}).scalar_one_or_none()
+        assert record is not None
+        assert str(record.id) == data["generation_id"]
+        assert record.user_id == user.id
+        assert record.status == "pending"
+        assert record.response is None  # Response not yet populated
+        assert record.prompt.splitlines() == ["Brief: Launch a new product campaign", *expected_prompt_lines]
+
+        # Verify background task was added
+        assert mock_background.called
+
+    def test_generate_content_with_assets(
+        self, mock_background: MagicMock, test_client: TestClient, user_with_project, test_db_session
+    ):
+        """Test content generation with project assets returns 202 Accepted."""
+        _, auth_headers, project = user_with_project
+
+        # Create assets
+        asset1 = Asset(
+            project_id=project.id,
+            filename="document.pdf",
+            content_type="application/pdf",
+            ingested=True,
+        )
+        asset2 = Asset(
+            project_id=project.id,
+            filename="image.jpg",
+            content_type="image/jpeg",
+            ingested=False,
+        )
+        test_db_session.add_all([asset1, asset2])
+        test_db_session.flush()
+
+        request_data = {
+            "project_id": str(project.id),
+            "brief": "Campaign brief",
+        }
+
+        response = test_client.post(
+            "/api/generate",
+            json=request_data,
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 202
+
+        # Verify background task was called with asset summaries
+        assert mock_background.called
+        call_args = mock_background.call_args
+        # Arguments: generation_id, brief, project_id, project_name,
+        # project_description, brand_tone, objective, asset_summaries
+        asset_summaries = call_args[0][7]  # asset_summaries is the 8th positional argument (after adding objective)
+        assert asset_summaries is not None
+        assert len(asset_summaries) == 2
+        assert asset_summaries[0]["filename"] == "document.pdf"
+        assert asset_summaries[1]["filename"] == "image.jpg"
+
+
+class TestGenerateErrors:
+    """Tests for POST /api/generate requests that are rejected before any generation starts."""
+
+    def test_generate_content_without_auth(self, test_client: TestClient):
+        """Test content generation without authentication returns 403."""
+        request_data = {
+            "project_id": str(uuid4()),
+            "brief": "Campaign brief",
+        }
+
+        response = test_client.post("/api/generate", json=request_data)
+
+        assert response.status_code == 403
+
+    def test_generate_content_with_nonexistent_project(self, test_client: TestClient, auth_headers: dict[str, str]):
+        """Test content generation with non-existent project returns 404."""
+        request_data = {
+            "project_id": str(uuid4()),
+            "brief": "Campaign brief",
+        }
+
+        response = test_client.post(
+            "/api/generate",
+            json=request_data,
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Project not found"
+
+    def test_generate_content_with_other_user_project(self, test_client: TestClient, create_users, test_db_session):
+        """Test content generation with another user's project returns 403."""
+        (user1, _), (user2, token2) = create_users(
+            {"password": "testpassword123", "name": "Owner"},
+            {"password": "testpassword123", "name": "Other User"},
+        )
+        other_headers = {"Authorization": f"Bearer {token2}"}
+
+        project = Project(owner_id=user1.id, name="Owner's Project")
+        test_db_session.add(project)
+        test_db_session.flush()
+
+        request_data = {
+            "project_id": str(project.id),
+            "brief": "Campaign brief",
+        }
+
+        response = test_client.post(
+            "/api/generate",
+            json=request_data,
+            headers=other_headers,
+        )
+
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Not authorized to generate content for this project"
+
+    def test_generate_content_with_invalid_project_id_format(
+        self, test_client: TestClient, auth_headers: dict[str, str]
+    ):
+        """Test content generation with invalid project ID format."""
+        request_data = {
+            "project_id": "not-a-uuid",
+            "brief": "Campaign brief",
+        }
+
+        response = test_client.post(
+            "/api/generate",
+            json=request_data,
+            headers=auth_headers,
+        )
+
+        # FastAPI will validate UUID format and return 422
+        assert response.status_code == 422
+
+    def test_generate_content_with_empty_brief(self, test_client: TestClient, user_with_project):
+        """Test content generation with empty brief returns validation error."""
+        _, auth_headers, project = user_with_project
+
+        request_data = {
+            "project_id": str(project.id),
+            "brief": "",
+        }
+
+        response = test_client.post(
+            "/api/generate",
+            json=request_data,
+            headers=auth_headers,
+        )
+
+        # Pydantic validation should reject empty brief
+        assert response.status_code == 422
 
 
 # Tests for update_generated_content endpoint
 
 
-@patch("backend.routers.generation._generate_content_background")
 def test_update_generated_content_success(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
+    mock_background: MagicMock, test_client: TestClient, user_with_project, test_db_session
 ):
     """Test successful content update."""
-    user, token = create_user(
-        email="updateuser@example.com",
-        password="testpassword123",
-        name="Update User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    user, auth_headers, project = user_with_project
 
     # Create a completed generation record manually
     generation_record = GenerationRecord(
@@ -502,8 +390,7 @@ def test_update_generated_content_success(
         status="completed",
     )
     test_db_session.add(generation_record)
-    test_db_session.commit()
-    test_db_session.refresh(generation_record)
+    test_db_session.flush()
     generation_id = generation_record.id
 
     # Now update the content
@@ -516,7 +403,7 @@ def test_update_generated_content_success(
     response = test_client.patch(
         f"/api/generate/{generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 200
@@ -530,33 +417,18 @@ def test_update_generated_content_success(
     assert data["updated"]["metadata"]["project_id"] == str(project.id)
 
     # Verify the generation record was updated in the database
-    record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.desc())
-        .first()
-    )
+    record = test_db_session.execute(_LATEST_RECORD_FOR_PROJECT, {"project_id": project.id}).scalar_one_or_none()
     assert record is not None
     assert record.response["short_form"] == "Updated short form"
     assert record.response["long_form"] == "Updated long form content"
     assert record.response["cta"] == "Updated CTA"
 
 
-@patch("backend.routers.generation._generate_content_background")
 def test_update_generated_content_partial(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
+    mock_background: MagicMock, test_client: TestClient, user_with_project, test_db_session
 ):
     """Test partial content update (only some fields)."""
-    user, token = create_user(
-        email="partialupdate@example.com",
-        password="testpassword123",
-        name="Partial Update User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    user, auth_headers, project = user_with_project
 
     # Create a completed generation record manually
     generation_record = GenerationRecord(
@@ -573,8 +445,7 @@ def test_update_generated_content_partial(
         status="completed",
     )
     test_db_session.add(generation_record)
-    test_db_session.commit()
-    test_db_session.refresh(generation_record)
+    test_db_session.flush()
     generation_id = generation_record.id
 
     # Update only short_form
@@ -585,7 +456,7 @@ def test_update_generated_content_partial(
     response = test_client.patch(
         f"/api/generate/{generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 200
@@ -596,32 +467,17 @@ def test_update_generated_content_partial(
     assert data["updated"]["cta"] == "Original CTA"
 
     # Verify in database
-    record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.desc())
-        .first()
-    )
+    record = test_db_session.execute(_LATEST_RECORD_FOR_PROJECT, {"project_id": project.id}).scalar_one_or_none()
     assert record.response["short_form"] == "Only short form updated"
     assert record.response["long_form"] == "Original long form content"
     assert record.response["cta"] == "Original CTA"
 
 
-@patch("backend.routers.generation._generate_content_background")
 def test_update_generated_content_preserves_metadata(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
+    mock_background: MagicMock, test_client: TestClient, user_with_project, test_db_session
 ):
     """Test that update preserves original metadata."""
-    user, token = create_user(
-        email="metadata@example.com",
-        password="testpassword123",
-        name="Metadata User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    user, auth_headers, project = user_with_project
 
     # Create a completed generation record manually
     generation_record = GenerationRecord(
@@ -638,8 +494,7 @@ def test_update_generated_content_preserves_metadata(
         status="completed",
     )
     test_db_session.add(generation_record)
-    test_db_session.commit()
-    test_db_session.refresh(generation_record)
+    test_db_session.flush()
     original_model = generation_record.model
     generation_id = generation_record.id
 
@@ -651,7 +506,7 @@ def test_update_generated_content_preserves_metadata(
     response = test_client.patch(
         f"/api/generate/{generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 200
@@ -660,12 +515,9 @@ def test_update_generated_content_preserves_metadata(
     assert data["updated"]["metadata"]["model"] == original_model
 
     # Verify model is still the same in database
-    updated_record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.desc())
-        .first()
-    )
+    updated_record = test_db_session.execute(
+        _LATEST_RECORD_FOR_PROJECT, {"project_id": project.id}
+    ).scalar_one_or_none()
     assert updated_record.model == original_model
 
 
@@ -680,14 +532,8 @@ def test_update_generated_content_without_auth(test_client: TestClient):
     assert response.status_code == 403
 
 
-def test_update_generated_content_with_nonexistent_generation_id(test_client: TestClient, create_user):
+def test_update_generated_content_with_nonexistent_generation_id(test_client: TestClient, auth_headers: dict[str, str]):
     """Test content update with non-existent generation_id returns 404."""
-    user, token = create_user(
-        email="notfound@example.com",
-        password="testpassword123",
-        name="Not Found User",
-    )
-
     update_request = {
         "short_form": "Updated content",
     }
@@ -695,40 +541,27 @@ def test_update_generated_content_with_nonexistent_generation_id(test_client: Te
     response = test_client.patch(
         f"/api/generate/{uuid4()}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 404
     assert response.json()["detail"] == "Generation record not found"
 
 
-@patch("backend.routers.generation.generate_content_variants")
 def test_update_generated_content_with_other_user_project(
-    mock_generate: AsyncMock, test_client: TestClient, create_user, test_db_session
+    fake_generate: _FakeGenerateContentVariants, test_client: TestClient, create_users, test_db_session
 ):
     """Test content update with another user's project returns 403."""
-    mock_generate.return_value = {
-        "short_form": "Content",
-        "long_form": "Content",
-        "cta": "Content",
-        "metadata": {"model": "gpt-3.5-turbo-instruct", "provider": "openai"},
-    }
-
-    user1, token1 = create_user(
-        email="owner@example.com",
-        password="testpassword123",
-        name="Owner",
-    )
-    user2, token2 = create_user(
-        email="other@example.com",
-        password="testpassword123",
-        name="Other User",
+    (user1, token1), (user2, token2) = create_users(
+        {"password": "testpassword123", "name": "Owner"},
+        {"password": "testpassword123", "name": "Other User"},
     )
+    owner_headers = {"Authorization": f"Bearer {token1}"}
+    other_headers = {"Authorization": f"Bearer {token2}"}
 
     project = Project(owner_id=user1.id, name="Owner's Project")
     test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    test_db_session.flush()
 
     # Generate content for user1's project
     generate_request = {
@@ -738,12 +571,19 @@ def test_update_generated_content_with_other_user_project(
     test_client.post(
         "/api/generate",
         json=generate_request,
-        headers={"Authorization": f"Bearer {token1}"},
+        headers=owner_headers,
     )
 
+    # The real background task ran and called the generator with the request's context
+    assert len(fake_generate.calls) == 1
+    assert fake_generate.calls[0]["brief"] == "Test brief"
+    assert fake_generate.calls[0]["project_id"] == project.id
+    assert fake_generate.calls[0]["project_name"] == "Owner's Project"
+
     # Get the generation record ID
-    record = test_db_session.query(GenerationRecord).filter(GenerationRecord.project_id == project.id).first()
-    generation_id = record.id
+    generation_id = test_db_session.execute(
+        select(GenerationRecord.id).where(GenerationRecord.project_id == project.id).limit(1)
+    ).scalar()
 
     update_request = {
         "short_form": "Updated content",
@@ -752,28 +592,18 @@ def test_update_generated_content_with_other_user_project(
     response = test_client.patch(
         f"/api/generate/{generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token2}"},
+        headers=other_headers,
     )
 
     assert response.status_code == 403
     assert response.json()["detail"] == "Not authorized to update content for this project"
 
 
-@patch("backend.routers.generation._generate_content_background")
 def test_update_generated_content_with_tokens(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
+    mock_background: MagicMock, test_client: TestClient, user_with_project, test_db_session
 ):
     """Test that update preserves token information if available."""
-    user, token = create_user(
-        email="tokens@example.com",
-        password="testpassword123",
-        name="Tokens User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    user, auth_headers, project = user_with_project
 
     # Create a completed generation record with tokens
     generation_record = GenerationRecord(
@@ -790,8 +620,7 @@ def test_update_generated_content_with_tokens(
         status="completed",
     )
     test_db_session.add(generation_record)
-    test_db_session.commit()
-    test_db_session.refresh(generation_record)
+    test_db_session.flush()
     generation_id = generation_record.id
 
     # Update content
@@ -802,7 +631,7 @@ def test_update_generated_content_with_tokens(
     response = test_client.patch(
         f"/api/generate/{generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 200
@@ -811,14 +640,10 @@ def test_update_generated_content_with_tokens(
     assert data["updated"]["metadata"]["tokens_used"] == 300  # 100 + 200
 
 
-def test_update_generated_content_with_invalid_generation_id_format(test_client: TestClient, create_user):
+def test_update_generated_content_with_invalid_generation_id_format(
+    test_client: TestClient, auth_headers: dict[str, str]
+):
     """Test content update with invalid generation ID format."""
-    user, token = create_user(
-        email="invalid@example.com",
-        password="testpassword123",
-        name="Invalid User",
-    )
-
     update_request = {
         "short_form": "Updated content",
     }
@@ -826,28 +651,18 @@ def test_update_generated_content_with_invalid_generation_id_format(test_client:
     response = test_client.patch(
         "/api/generate/not-a-uuid",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     # FastAPI will validate UUID format and return 422
     assert response.status_code == 422
 
 
-@patch("backend.routers.generation._generate_content_background")
 def test_update_generated_content_all_fields_none(
-    mock_background: MagicMock, test_client: TestClient, create_user, test_db_session
+    mock_background: MagicMock, test_client: TestClient, user_with_project, test_db_session
 ):
     """Test update with all fields as None preserves existing content."""
-    user, token = create_user(
-        email="allnone@example.com",
-        password="testpassword123",
-        name="All None User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    user, auth_headers, project = user_with_project
 
     # Create a completed generation record manually
     generation_record = GenerationRecord(
@@ -864,8 +679,7 @@ def test_update_generated_content_all_fields_none(
         status="completed",
     )
     test_db_session.add(generation_record)
-    test_db_session.commit()
-    test_db_session.refresh(generation_record)
+    test_db_session.flush()
     generation_id = generation_record.id
 
     # Update with all None (should preserve existing)
@@ -874,7 +688,7 @@ def test_update_generated_content_all_fields_none(
     response = test_client.patch(
         f"/api/generate/{generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 200
@@ -885,208 +699,67 @@ def test_update_generated_content_all_fields_none(
     assert data["updated"]["cta"] == "Original CTA"
 
 
-@patch("backend.routers.generation.generate_content_variants")
-def test_update_generated_content_latest_record(
-    mock_generate: AsyncMock, test_client: TestClient, create_user, test_db_session
+@pytest.mark.parametrize(
+    "target",
+    [
+        pytest.param("latest", id="latest_record"),
+        pytest.param("older", id="specific_generation_id"),
+    ],
+)
+def test_update_generated_content_updates_only_target_record(
+    target: str,
+    two_generations: tuple[dict[str, str], Project, UUID, UUID],
+    test_client: TestClient,
+    test_db_session,
 ):
-    """Test that update modifies the latest generation record when multiple exist."""
-    mock_generate.return_value = {
-        "short_form": "Content",
-        "long_form": "Content",
-        "cta": "Content",
-        "metadata": {"model": "gpt-3.5-turbo-instruct", "provider": "openai"},
-    }
-
-    user, token = create_user(
-        email="latest@example.com",
-        password="testpassword123",
-        name="Latest User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    # Generate content twice
-    generate_request = {
-        "project_id": str(project.id),
-        "brief": "First brief",
-    }
-    test_client.post(
-        "/api/generate",
-        json=generate_request,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    generate_request2 = {
-        "project_id": str(project.id),
-        "brief": "Second brief",
-    }
-    test_client.post(
-        "/api/generate",
-        json=generate_request2,
-        headers={"Authorization": f"Bearer {token}"},
-    )
+    """Test that update modifies only the requested generation record when multiple exist."""
+    auth_headers, project, older_generation_id, latest_generation_id = two_generations
+    if target == "latest":
+        target_generation_id, other_generation_id = latest_generation_id, older_generation_id
+    else:
+        target_generation_id, other_generation_id = older_generation_id, latest_generation_id
 
     # Count records before update
-    records_before = test_db_session.query(GenerationRecord).filter(GenerationRecord.project_id == project.id).count()
+    records_before = test_db_session.execute(
+        select(func.count()).select_from(GenerationRecord).where(GenerationRecord.project_id == project.id)
+    ).scalar_one()
     assert records_before == 2
 
-    # Get the latest generation record ID
-    latest_record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.desc())
-        .first()
-    )
-    latest_generation_id = latest_record.id
-
-    # Update should only affect the latest record
     update_request = {
-        "short_form": "Updated latest",
+        "short_form": f"Updated {target} record",
     }
 
     response = test_client.patch(
-        f"/api/generate/{latest_generation_id}",
+        f"/api/generate/{target_generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 200
     data = response.json()
-    assert data["updated"]["short_form"] == "Updated latest"
-
-    # Verify only the latest record was updated
-    latest_record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.desc())
-        .first()
-    )
-    assert latest_record.response["short_form"] == "Updated latest"
-
-    # Verify the older record is unchanged
-    older_record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.asc())
-        .first()
-    )
-    assert older_record.response["short_form"] == "Content"
-
+    assert data["updated"]["short_form"] == f"Updated {target} record"
 
-@patch("backend.routers.generation.generate_content_variants")
-def test_update_generated_content_with_specific_generation_id(
-    mock_generate: AsyncMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test updating a specific generation record by ID."""
-    mock_generate.return_value = {
-        "short_form": "Content",
-        "long_form": "Content",
-        "cta": "Content",
-        "metadata": {"model": "gpt-3.5-turbo-instruct", "provider": "openai"},
-    }
+    # Verify the target record was updated
+    target_record = test_db_session.get(GenerationRecord, target_generation_id)
+    assert target_record.response["short_form"] == f"Updated {target} record"
 
-    user, token = create_user(
-        email="specific@example.com",
-        password="testpassword123",
-        name="Specific User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    # Generate content twice
-    generate_request = {
-        "project_id": str(project.id),
-        "brief": "First brief",
-    }
-    test_client.post(
-        "/api/generate",
-        json=generate_request,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    generate_request2 = {
-        "project_id": str(project.id),
-        "brief": "Second brief",
-    }
-    test_client.post(
-        "/api/generate",
-        json=generate_request2,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    # Get the older (first) generation record
-    older_record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.asc())
-        .first()
-    )
-    older_generation_id = older_record.id
-
-    # Update the older record specifically
-    update_request = {
-        "short_form": "Updated older record",
-    }
-
-    response = test_client.patch(
-        f"/api/generate/{older_generation_id}",
-        json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 200
-    data = response.json()
-    assert data["updated"]["short_form"] == "Updated older record"
-
-    # Verify the older record was updated
-    updated_older_record = (
-        test_db_session.query(GenerationRecord).filter(GenerationRecord.id == older_generation_id).first()
-    )
-    assert updated_older_record.response["short_form"] == "Updated older record"
-
-    # Verify the latest record is unchanged
-    latest_record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.desc())
-        .first()
-    )
-    assert latest_record.response["short_form"] == "Content"
+    # Verify the other record is unchanged
+    other_record = test_db_session.get(GenerationRecord, other_generation_id)
+    assert other_record.response["short_form"] == "Content"
 
 
-@patch("backend.routers.generation.generate_content_variants")
-def test_update_generated_content_with_different_user_project(
-    mock_generate: AsyncMock, test_client: TestClient, create_user, test_db_session
-):
+def test_update_generated_content_with_different_user_project(test_client: TestClient, create_users, test_db_session):
     """Test updating with a generation_id from another user's project returns 403."""
-    mock_generate.return_value = {
-        "short_form": "Content",
-        "long_form": "Content",
-        "cta": "Content",
-        "metadata": {"model": "gpt-3.5-turbo-instruct", "provider": "openai"},
-    }
-
-    user1, token1 = create_user(
-        email="user1@example.com",
-        password="testpassword123",
-        name="User 1",
-    )
-    user2, token2 = create_user(
-        email="user2@example.com",
-        password="testpassword123",
-        name="User 2",
+    (user1, token1), (user2, token2) = create_users(
+        {"password": "testpassword123", "name": "User 1"},
+        {"password": "testpassword123", "name": "User 2"},
     )
+    owner_headers = {"Authorization": f"Bearer {token1}"}
+    other_headers = {"Authorization": f"Bearer {token2}"}
 
     project1 = Project(owner_id=user1.id, name="User 1 Project")
     test_db_session.add(project1)
-    test_db_session.commit()
-    test_db_session.refresh(project1)
+    test_db_session.flush()
 
     # Generate content for user1's project
     generate_request1 = {
@@ -1096,12 +769,13 @@ def test_update_generated_content_with_different_user_project(
     test_client.post(
         "/api/generate",
         json=generate_request1,
-        headers={"Authorization": f"Bearer {token1}"},
+        headers=owner_headers,
     )
 
     # Get generation_id from project1
-    project1_record = test_db_session.query(GenerationRecord).filter(GenerationRecord.project_id == project1.id).first()
-    project1_generation_id = project1_record.id
+    project1_generation_id = test_db_session.execute(
+        select(GenerationRecord.id).where(GenerationRecord.project_id == project1.id).limit(1)
+    ).scalar()
 
     # Try to update user1's generation using user2's token
     update_request = {
@@ -1111,83 +785,8 @@ def test_update_generated_content_with_different_user_project(
     response = test_client.patch(
         f"/api/generate/{project1_generation_id}",
         json=update_request,
-        headers={"Authorization": f"Bearer {token2}"},
+        headers=other_headers,
     )
 
     assert response.status_code == 403
     assert "Not authorized to update content for this project" in response.json()["detail"]
-
-
-@patch("backend.routers.generation.generate_content_variants")
-def test_update_generated_content_specific_generation_by_id(
-    mock_generate: AsyncMock, test_client: TestClient, create_user, test_db_session
-):
-    """Test updating a specific generation record by ID."""
-    mock_generate.return_value = {
-        "short_form": "Content",
-        "long_form": "Content",
-        "cta": "Content",
-        "metadata": {"model": "gpt-3.5-turbo-instruct", "provider": "openai"},
-    }
-
-    user, token = create_user(
-        email="fallback@example.com",
-        password="testpassword123",
-        name="Fallback User",
-    )
-
-    project = Project(owner_id=user.id, name="Test Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    # Generate content twice
-    generate_request = {
-        "project_id": str(project.id),
-        "brief": "First brief",
-    }
-    test_client.post(
-        "/api/generate",
-        json=generate_request,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    generate_request2 = {
-        "project_id": str(project.id),
-        "brief": "Second brief",
-    }
-    test_client.post(
-        "/api/generate",
-        json=generate_request2,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    # Get the latest generation record ID
-    latest_record = (
-        test_db_session.query(GenerationRecord)
-        .filter(GenerationRecord.project_id == project.id)
-        .order_by(GenerationRecord.created_at.desc())
-        .first()
-    )
-    latest_generation_id = latest_record.id
-
-    # Update the latest record
-    update_request = {
-        "short_form": "Updated latest",
-    }
-
-    response = test_client.patch(
-        f"/api/generate/{latest_generation_id}",
-        json=update_request,
-        headers={"Authorization": f"Bearer {token}"},
-    )
-
-    assert response.status_code == 200
-    data = response.json()
-    assert data["updated"]["short_form"] == "Updated latest"
-
-    # Verify the latest record was updated
-    updated_latest_record = (
-        test_db_session.query(GenerationRecord).filter(GenerationRecord.id == latest_generation_id).first()
-    )
-    assert updated_latest_record.response["short_form"] == "Updated latest"
@@ -4,7 +4,6 @@ from unittest.mock import MagicMock, patch
 
 from backend.models.asset import Asset
 from backend.models.project import Project
-from backend.models.user import User
 from fastapi.testclient import TestClient
 
 
@@ -97,23 +96,14 @@ def test__create_asset_without_filename__returns_422(test_client: TestClient, cr
     assert response.status_code == 422
 
 
-def test__create_asset_without_auth__returns_403(test_client: TestClient, test_db_session):
+def test__create_asset_without_auth__returns_403(test_client: TestClient, create_user, test_db_session):
     """Test asset creation without authentication returns 403."""
     # Create a user and project without token
-    from backend.core.security import hash_password
-    from datetime import datetime, timezone
-    from uuid import uuid4
-
-    user = User(
-        id=uuid4(),
+    user, _ = create_user(
         email="unauth@example.com",
-        password_hash=hash_password("testpassword123"),
+        password="testpassword123",
         name="Unauth User",
-        created_at=datetime.now(timezone.utc),
     )
-    test_db_session.add(user)
-    test_db_session.commit()
-    test_db_session.refresh(user)
 
     project = Project(owner_id=user.id, name="Test Project")
     test_db_session.add(project)
@@ -556,8 +546,7 @@ def test__delete_asset__removes_asset(
     assert response.status_code == 204
 
     # Verify asset was deleted from database
-    deleted_asset = test_db_session.query(Asset).filter(Asset.id == asset_id).first()
-    assert deleted_asset is None
+    assert test_db_session.get(Asset, asset_id) is None
 
     # Verify storage.delete was called with correct arguments
     mock_storage.delete.assert_called_once_with(project.id, asset_id, asset.filename)
@@ -935,22 +924,13 @@ def test__ingest_asset_already_ingesting__returns_409(test_client: TestClient, c
     assert "already being ingested" in response.json()["detail"].lower()
 
 
-def test__ingest_asset_without_auth__returns_403(test_client: TestClient, test_db_session):
+def test__ingest_asset_without_auth__returns_403(test_client: TestClient, create_user, test_db_session):
     """Test ingestion without authentication returns 403."""
-    from backend.core.security import hash_password
-    from datetime import datetime, timezone
-    from uuid import uuid4
-
-    user = User(
-        id=uuid4(),
+    user, _ = create_user(
         email="unauthingest@example.com",
-        password_hash=hash_password("testpassword123"),
+        password="testpassword123",
         name="Unauth Ingest User",
-        created_at=datetime.now(timezone.utc),
     )
-    test_db_session.add(user)
-    test_db_session.commit()
-    test_db_session.refresh(user)
 
     project = Project(owner_id=user.id, name="Test Project")
     test_db_session.add(project)
@@ -1,9 +1,94 @@
 """Tests for projects router."""
 
+from typing import Annotated, Callable, Generator
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Row, insert
+from sqlalchemy.orm import Session
+
+from backend.core.dependencies import get_current_user, security
+from backend.database import get_db
+from backend.main import app
 from backend.models.project import Project
+from backend.models.user import User
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.testclient import TestClient
 
 
+@pytest.fixture
+def user_ids_by_token() -> dict[str, UUID]:
+    """Tokens issued by this module's user factories, mapped to their user IDs."""
+    return {}
+
+
+@pytest.fixture
+def create_user(create_user: Callable, user_ids_by_token: dict[str, UUID]) -> Callable:
+    """Wrap the shared create_user factory to remember each issued token."""
+
+    def _create_user(*args, **kwargs) -> tuple[User, str]:
+        user, token = create_user(*args, **kwargs)
+        user_ids_by_token[token] = user.id
+        return user, token
+
+    return _create_user
+
+
+@pytest.fixture
+def create_users(create_users: Callable, user_ids_by_token: dict[str, UUID]) -> Callable:
+    """Wrap the shared create_users factory to remember each issued token."""
+
+    def _create_users(*specs: dict) -> list[tuple[User, str]]:
+        created = create_users(*specs)
+        user_ids_by_token.update((token, user.id) for user, token in created)
+        return created
+
+    return _create_users
+
+
+@pytest.fixture
+def project_factory(test_db_session: Session) -> Callable:
+    """Factory inserting a project with a single Core INSERT ... RETURNING.
+
+    Skips the ORM unit of work; the returned row exposes the inserted
+    `id`, `owner_id`, `name` and `description` as attributes.
+    """
+
+    def _create_project(*, owner_id: UUID, name: str, description: str | None = None) -> Row:
+        return test_db_session.execute(
+            insert(Project)
+            .values(owner_id=owner_id, name=name, description=description)
+            .returning(Project.id, Project.owner_id, Project.name, Project.description)
+        ).one()
+
+    return _create_project
+
+
+@pytest.fixture(autouse=True)
+def known_token_current_user(user_ids_by_token: dict[str, UUID]) -> Generator[None, None, None]:
+    """Resolve tokens issued in this module without decoding and verifying the JWT.
+
+    The bearer scheme still runs, so requests without credentials are rejected
+    as before, and unknown tokens (e.g. "invalid_token") fall through to the
+    real `get_current_user`.
+    """
+
+    async def _get_current_user(
+        credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+        db: Annotated[Session, Depends(get_db)],
+    ) -> User:
+        user_id = user_ids_by_token.get(credentials.credentials)
+        if user_id is None:
+            return await get_current_user(credentials, db)
+        # Identity-map hit: the user was created on this same session
+        return db.get(User, user_id)
+
+    app.dependency_overrides[get_current_user] = _get_current_user
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
 def test_create_project_success(test_client: TestClient, create_user):
     """Test successful project creation."""
     # Create a user and get token
@@ -34,20 +119,14 @@ def test_create_project_success(test_client: TestClient, create_user):
     assert "updated_at" in data
 
 
-def test_create_project_without_description(test_client: TestClient, create_user):
+def test_create_project_without_description(test_client: TestClient, auth_headers: dict[str, str]):
     """Test project creation without description."""
-    user, token = create_user(
-        email="nodesc@example.com",
-        password="testpassword123",
-        name="No Desc User",
-    )
-
     project_data = {"name": "Simple Project"}
 
     response = test_client.post(
         "/api/projects",
         json=project_data,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 201
@@ -84,7 +163,7 @@ def test_create_project_invalid_token(test_client: TestClient):
     assert response.status_code == 401
 
 
-def test_list_projects_success(test_client: TestClient, create_user, test_db_session):
+def test_list_projects_success(test_client: TestClient, create_user, project_factory):
     """Test listing user's projects."""
     user, token = create_user(
         email="listuser@example.com",
@@ -93,18 +172,16 @@ def test_list_projects_success(test_client: TestClient, create_user, test_db_ses
     )
 
     # Create multiple projects for this user
-    project1 = Project(
+    project_factory(
         owner_id=user.id,
         name="Project 1",
         description="First project",
     )
-    project2 = Project(
+    project_factory(
         owner_id=user.id,
         name="Project 2",
         description="Second project",
     )
-    test_db_session.add_all([project1, project2])
-    test_db_session.commit()
 
     response = test_client.get(
         "/api/projects",
@@ -118,17 +195,11 @@ def test_list_projects_success(test_client: TestClient, create_user, test_db_ses
     assert all(project["owner_id"] == str(user.id) for project in data)
 
 
-def test_list_projects_empty(test_client: TestClient, create_user):
+def test_list_projects_empty(test_client: TestClient, auth_headers: dict[str, str]):
     """Test listing projects when user has none."""
-    user, token = create_user(
-        email="emptyuser@example.com",
-        password="testpassword123",
-        name="Empty User",
-    )
-
     response = test_client.get(
         "/api/projects",
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 200
@@ -136,24 +207,16 @@ def test_list_projects_empty(test_client: TestClient, create_user):
     assert data == []
 
 
-def test_list_projects_other_user_projects_not_included(test_client: TestClient, create_user, test_db_session):
+def test_list_projects_other_user_projects_not_included(test_client: TestClient, create_users, project_factory):
     """Test that users only see their own projects."""
-    user1, token1 = create_user(
-        email="user1@example.com",
-        password="testpassword123",
-        name="User 1",
-    )
-    user2, _ = create_user(
-        email="user2@example.com",
-        password="testpassword123",
-        name="User 2",
+    (user1, token1), (user2, _) = create_users(
+        {"email": "user1@example.com", "password": "testpassword123", "name": "User 1"},
+        {"email": "user2@example.com", "password": "testpassword123", "name": "User 2"},
     )
 
     # Create projects for both users
-    project1 = Project(owner_id=user1.id, name="User1 Project")
-    project2 = Project(owner_id=user2.id, name="User2 Project")
-    test_db_session.add_all([project1, project2])
-    test_db_session.commit()
+    project_factory(owner_id=user1.id, name="User1 Project")
+    project_factory(owner_id=user2.id, name="User2 Project")
 
     response = test_client.get(
         "/api/projects",
@@ -167,7 +230,7 @@ def test_list_projects_other_user_projects_not_included(test_client: TestClient,
     assert data[0]["owner_id"] == str(user1.id)
 
 
-def test_get_project_success(test_client: TestClient, create_user, test_db_session):
+def test_get_project_success(test_client: TestClient, create_user, project_factory):
     """Test getting a specific project."""
     user, token = create_user(
         email="getuser@example.com",
@@ -175,14 +238,11 @@ def test_get_project_success(test_client: TestClient, create_user, test_db_sessi
         name="Get User",
     )
 
-    project = Project(
+    project = project_factory(
         owner_id=user.id,
         name="Test Project",
         description="Test description",
     )
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
 
     response = test_client.get(
         f"/api/projects/{project.id}",
@@ -197,51 +257,53 @@ def test_get_project_success(test_client: TestClient, create_user, test_db_sessi
     assert data["owner_id"] == str(user.id)
 
 
-def test_get_project_not_found(test_client: TestClient, create_user):
+def test_get_project_not_found(test_client: TestClient, auth_headers: dict[str, str]):
     """Test getting non-existent project returns 404."""
-    user, token = create_user(
-        email="notfound@example.com",
-        password="testpassword123",
-        name="Not Found User",
-    )
-
     response = test_client.get(
         "/api/projects/00000000-0000-0000-0000-000000000000",
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 404
     assert response.json()["detail"] == "Project not found"
 
 
-def test_get_project_unauthorized(test_client: TestClient, create_user, test_db_session):
-    """Test getting another user's project returns 403."""
-    user1, _ = create_user(
-        email="owner@example.com",
-        password="testpassword123",
-        name="Owner",
-    )
-    user2, token2 = create_user(
-        email="other@example.com",
-        password="testpassword123",
-        name="Other User",
-    )
-
-    project = Project(owner_id=user1.id, name="Owner's Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    response = test_client.get(
+@pytest.mark.parametrize(
+    ("method", "json_body", "expected_detail"),
+    [
+        pytest.param("GET", None, "Not authorized to access this project", id="get"),
+        pytest.param("PATCH", {"name": "Hacked Name"}, "Not authorized to update this project", id="update"),
+        pytest.param("DELETE", None, "Not authorized to delete this project", id="delete"),
+    ],
+)
+def test_other_user_project_forbidden(
+    method: str,
+    json_body: dict | None,
+    expected_detail: str,
+    test_client: TestClient,
+    create_users,
+    project_factory,
+):
+    """Test that reading, updating or deleting another user's project returns 403."""
+    (user1, _), (user2, token2) = create_users(
+        {"email": "owner@example.com", "password": "testpassword123", "name": "Owner"},
+        {"email": "other@example.com", "password": "testpassword123", "name": "Other User"},
+    )
+
+    project = project_factory(owner_id=user1.id, name="Owner's Project")
+
+    response = test_client.request(
+        method,
         f"/api/projects/{project.id}",
+        json=json_body,
         headers={"Authorization": f"Bearer {token2}"},
     )
 
     assert response.status_code == 403
-    assert response.json()["detail"] == "Not authorized to access this project"
+    assert response.json()["detail"] == expected_detail
 
 
-def test_update_project_success(test_client: TestClient, create_user, test_db_session):
+def test_update_project_success(test_client: TestClient, create_user, project_factory):
     """Test successful project update."""
     user, token = create_user(
         email="updateuser@example.com",
@@ -249,10 +311,7 @@ def test_update_project_success(test_client: TestClient, create_user, test_db_se
         name="Update User",
     )
 
-    project = Project(owner_id=user.id, name="Original Name", description="Original desc")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    project = project_factory(owner_id=user.id, name="Original Name", description="Original desc")
 
     update_data = {
         "name": "Updated Name",
@@ -272,7 +331,7 @@ def test_update_project_success(test_client: TestClient, create_user, test_db_se
     assert data["id"] == str(project.id)
 
 
-def test_update_project_partial(test_client: TestClient, create_user, test_db_session):
+def test_update_project_partial(test_client: TestClient, create_user, project_factory):
     """Test partial project update (only name)."""
     user, token = create_user(
         email="partial@example.com",
@@ -280,10 +339,7 @@ def test_update_project_partial(test_client: TestClient, create_user, test_db_se
         name="Partial User",
     )
 
-    project = Project(owner_id=user.id, name="Original", description="Original desc")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    project = project_factory(owner_id=user.id, name="Original", description="Original desc")
 
     update_data = {"name": "Updated Name"}
 
@@ -299,37 +355,7 @@ def test_update_project_partial(test_client: TestClient, create_user, test_db_se
     assert data["description"] == "Original desc"  # Unchanged
 
 
-def test_update_project_unauthorized(test_client: TestClient, create_user, test_db_session):
-    """Test updating another user's project returns 403."""
-    user1, _ = create_user(
-        email="owner2@example.com",
-        password="testpassword123",
-        name="Owner 2",
-    )
-    user2, token2 = create_user(
-        email="other2@example.com",
-        password="testpassword123",
-        name="Other 2",
-    )
-
-    project = Project(owner_id=user1.id, name="Owner's Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    update_data = {"name": "Hacked Name"}
-
-    response = test_client.patch(
-        f"/api/projects/{project.id}",
-        json=update_data,
-        headers={"Authorization": f"Bearer {token2}"},
-    )
-
-    assert response.status_code == 403
-    assert response.json()["detail"] == "Not authorized to update this project"
-
-
-def test_delete_project_success(test_client: TestClient, create_user, test_db_session):
+def test_delete_project_success(test_client: TestClient, create_user, project_factory, test_db_session):
     """Test successful project deletion."""
     user, token = create_user(
         email="deleteuser@example.com",
@@ -337,10 +363,7 @@ def test_delete_project_success(test_client: TestClient, create_user, test_db_se
         name="Delete User",
     )
 
-    project = Project(owner_id=user.id, name="To Delete")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
+    project = project_factory(owner_id=user.id, name="To Delete")
     project_id = project.id
 
     response = test_client.delete(
@@ -351,45 +374,11 @@ def test_delete_project_success(test_client: TestClient, create_user, test_db_se
     assert response.status_code == 204
 
     # Verify project was deleted
-    deleted_project = test_db_session.query(Project).filter(Project.id == project_id).first()
-    assert deleted_project is None
+    assert test_db_session.get(Project, project_id) is None
 
 
-def test_delete_project_unauthorized(test_client: TestClient, create_user, test_db_session):
-    """Test deleting another user's project returns 403."""
-    user1, _ = create_user(
-        email="owner3@example.com",
-        password="testpassword123",
-        name="Owner 3",
-    )
-    user2, token2 = create_user(
-        email="other3@example.com",
-        password="testpassword123",
-        name="Other 3",
-    )
-
-    project = Project(owner_id=user1.id, name="Owner's Project")
-    test_db_session.add(project)
-    test_db_session.commit()
-    test_db_session.refresh(project)
-
-    response = test_client.delete(
-        f"/api/projects/{project.id}",
-        headers={"Authorization": f"Bearer {token2}"},
-    )
-
-    assert response.status_code == 403
-    assert response.json()["detail"] == "Not authorized to delete this project"
-
-
-def test_create_project_name_normalization(test_client: TestClient, create_user):
+def test_create_project_name_normalization(test_client: TestClient, auth_headers: dict[str, str]):
     """Test that project name is normalized (whitespace stripped)."""
-    user, token = create_user(
-        email="normalize@example.com",
-        password="testpassword123",
-        name="Normalize User",
-    )
-
     project_data = {
         "name": "  Normalized Project  ",
         "description": "  Normalized Description  ",
@@ -398,7 +387,7 @@ def test_create_project_name_normalization(test_client: TestClient, create_user)
     response = test_client.post(
         "/api/projects",
         json=project_data,
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 201
@@ -407,17 +396,11 @@ def test_create_project_name_normalization(test_client: TestClient, create_user)
     assert data["description"] == "Normalized Description"
 
 
-def test_get_project_invalid_uuid(test_client: TestClient, create_user):
+def test_get_project_invalid_uuid(test_client: TestClient, auth_headers: dict[str, str]):
     """Test getting project with invalid UUID format returns 400."""
-    user, token = create_user(
-        email="invalid@example.com",
-        password="testpassword123",
-        name="Invalid User",
-    )
-
     response = test_client.get(
         "/api/projects/invalid-uuid",
-        headers={"Authorization": f"Bearer {token}"},
+        headers=auth_headers,
     )
 
     assert response.status_code == 400
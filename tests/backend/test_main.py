@@ -1,13 +1,9 @@
 from fastapi.testclient import TestClient
 
-from backend.main import app
 
-client = TestClient(app)
-
-
-def test_health_endpoint():
+def test_health_endpoint(test_client: TestClient):
     """Test that the /health endpoint returns the correct response."""
-    response = client.get("/health")
+    response = test_client.get("/health")
 
     assert response.status_code == 200
     assert response.headers["content-type"] == "application/json"